@@ -1,5 +1,8 @@
+import logging
 import dc_mini_host_py as dc
 
+log = logging.getLogger("dcmini.stream")
+
 
 def main():
     try:
@@ -39,7 +42,7 @@ def main():
         try:
             # Start streaming data
             def print_data(data):
-                print("Received: ", data)
+                log.info("Received: %s", data)
 
             print("Starting data streaming...")
             streaming_config = client.start_streaming(print_data)
@@ -69,4 +72,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Received frames are logged at INFO; raise the level to silence them
+    logging.basicConfig(level=logging.INFO)
     main()
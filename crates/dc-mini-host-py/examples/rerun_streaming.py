@@ -4,81 +4,243 @@ Example of using Rerun to visualize streaming data from DC Mini Host.
 This script demonstrates real-time visualization of EEG data with advanced Rerun features.
 """
 
+import logging
+import threading
 import time
+import traceback
+from collections import deque
 import numpy as np
 import rerun as rr
 import rerun.blueprint as rrb
 import dc_mini_host_py as dc
 from datetime import datetime
 
+try:
+    import numba
+except ImportError:  # numba is optional, NumPy is used without it
+    numba = None
+
+log = logging.getLogger("dcmini.stream")
+
+# Coalesce consecutive frames into one Rerun batch, flushing at most every
+# FLUSH_INTERVAL seconds unless FLUSH_BYTES of samples are already pending
+FLUSH_INTERVAL = 0.05
+FLUSH_BYTES = 64 * 1024
+
+
+def parse_sample_rate(sample_rate):
+    """Convert an ADS sample rate label such as "250 SPS" or "1 KSPS" to Hz"""
+    value, unit = sample_rate.split()
+    return float(value) * (1000.0 if unit.upper() == "KSPS" else 1.0)
+
+
+if numba is not None:
+
+    @numba.njit(fastmath=True, cache=True)
+    def unroll_normalize(data, start, count, mean, std, out):
+        """Unroll and normalize `count` ring samples from `start` into `out[c, i]`"""
+        max_samples, num_channels = data.shape
+        # Two contiguous ranges, [start, start + head) then [0, count - head),
+        # so the inner loops carry no modulo and can vectorize
+        head = min(count, max_samples - start)
+        for c in range(num_channels):
+            m = mean[c]
+            scale = np.float32(1.0) / (std[c] + np.float32(1e-6))
+            for i in range(head):
+                out[c, i] = (data[start + i, c] - m) * scale
+            for i in range(count - head):
+                out[c, head + i] = (data[i, c] - m) * scale
+
+else:
+
+    def unroll_normalize(data, start, count, mean, std, out):
+        """Unroll and normalize `count` ring samples from `start` into `out[c, i]`"""
+        head = min(count, data.shape[0] - start)
+        np.subtract(data[start : start + head].T, mean[:, None], out=out[:, :head])
+        np.subtract(data[: count - head].T, mean[:, None], out=out[:, head:count])
+        np.divide(out[:, :count], std[:, None] + np.float32(1e-6), out=out[:, :count])
+
 
 # Buffer to store recent data for display
 class DataBuffer:
     def __init__(self, max_samples=1000, num_channels=8, window_size=5.0):
         self.max_samples = max_samples
         self.num_channels = num_channels
-        self.data = [[] for _ in range(num_channels)]
-        self.timestamps = []
+        # Preallocated ring buffers: _w is the write cursor, _n the number of
+        # valid samples (shared by all channels since frames are rectangular).
+        # The data ring is sample-major, (max_samples, num_channels), matching
+        # the order samples arrive in: each frame is one contiguous block write
+        # and there is a single layout end to end. A channel is a strided
+        # column, and the heatmap takes the transpose.
+        self.data = np.zeros((max_samples, num_channels), dtype=np.float32)
+        self.timestamps = np.zeros(max_samples, dtype=np.float64)
+        self._w = 0
+        self._n = 0
+        self._total = 0  # Samples written since start
+        self._last_logged = 0  # Value of _total at the last Rerun flush
+        # Running per-channel sums over the ring, for heatmap normalization
+        self._sum = np.zeros(num_channels, dtype=np.float64)
+        self._sumsq = np.zeros(num_channels, dtype=np.float64)
         self.latest_timestamp = 0
         self.window_size = window_size  # Window size in seconds
         self.initialized = False
+        self.set_sample_rate(250.0)
+
+    def __len__(self):
+        return self._n
+
+    def set_sample_rate(self, sample_rate):
+        self._sample_interval = 1.0 / sample_rate
+        # Per-sample time offsets, rebuilt lazily for the current frame size
+        self._tmpl = None
 
     def add_frame(self, frame):
-        self.latest_timestamp = frame.timestamp
-
-        # Use the channel_data field which is already organized by channel
-        for ch_idx, channel_data in enumerate(frame.channel_data):
-            if ch_idx < self.num_channels:
-                self.data[ch_idx].extend(channel_data)
-                # Trim to max_samples
-                if len(self.data[ch_idx]) > self.max_samples:
-                    self.data[ch_idx] = self.data[ch_idx][-self.max_samples :]
-
-        # Add timestamps (convert device timestamp to seconds)
-        num_new_samples = (
-            len(frame.channel_data[0])
-            if frame.channel_data and frame.channel_data[0]
-            else 0
-        )
-        if num_new_samples > 0:
-            # Convert device timestamp to seconds for Rerun
-            device_time_sec = (
-                frame.timestamp / 1000.0
-            )  # Assuming timestamp is in milliseconds
-
-            # Create evenly spaced timestamps for the samples
-            sample_interval = (
-                1.0 / 250.0
-            )  # Assuming 250Hz sample rate, adjust as needed
-            new_timestamps = np.linspace(
-                device_time_sec,
-                device_time_sec + (num_new_samples - 1) * sample_interval,
-                num_new_samples,
+        """Append a frame's samples and return its (timestamp, sample count)"""
+        # Read each frame attribute once, since every access goes through a
+        # binding getter, and keep frequently used attributes in locals
+        timestamp = frame.timestamp
+        chunk = frame.samples_np
+        max_samples = self.max_samples
+        w = self._w
+        n = self._n
+        self.latest_timestamp = timestamp
+
+        # `chunk` is a zero-copy int32 view of shape (samples, channels); the
+        # ring assignment below converts it to float32 in a single pass
+        if chunk.ndim != 2 or chunk.shape[0] == 0:
+            return timestamp, 0
+        num_received = chunk.shape[0]
+        # Anything older than the ring capacity would be overwritten anyway
+        chunk = chunk[-max_samples:, : self.num_channels]
+        num_new_samples, num_channels = chunk.shape
+
+        # Remove the samples about to be overwritten from the running sums.
+        # The sums accumulate in float64 without widening the samples first.
+        evicted = n + num_new_samples - max_samples
+        if evicted > 0:
+            old = self._slice(self.data[:, :num_channels], w - n, evicted)
+            self._sum[:num_channels] -= old.sum(axis=0, dtype=np.float64)
+            self._sumsq[:num_channels] -= np.einsum(
+                "ij,ij->j", old, old, dtype=np.float64
             )
-            self.timestamps.extend(new_timestamps)
+        self._sum[:num_channels] += chunk.sum(axis=0, dtype=np.float64)
+        self._sumsq[:num_channels] += np.einsum(
+            "ij,ij->j", chunk, chunk, dtype=np.float64
+        )
+
+        # Convert device timestamp to seconds for Rerun
+        device_time_sec = timestamp / 1000.0  # Assuming timestamp is in milliseconds
 
-            # Trim timestamps
-            if len(self.timestamps) > self.max_samples:
-                self.timestamps = self.timestamps[-self.max_samples :]
+        # Create evenly spaced timestamps for the samples
+        if self._tmpl is None or len(self._tmpl) != num_new_samples:
+            self._tmpl = (
+                np.arange(num_new_samples, dtype=np.float64) * self._sample_interval
+            )
+        new_timestamps = self._tmpl + device_time_sec
+
+        self._write(self.data[:, :num_channels], chunk)
+        self._write(self.timestamps, new_timestamps)
+        self._w = (w + num_new_samples) % max_samples
+        self._n = min(n + num_new_samples, max_samples)
+        self._total += num_new_samples
+        return timestamp, num_received
+
+    def pending(self):
+        """Number of samples written since the last `mark_logged` call"""
+        return min(self._total - self._last_logged, self._n)
+
+    def mark_logged(self):
+        self._last_logged = self._total
+
+    def _write(self, ring, chunk):
+        """Copy `chunk` (samples on the first axis) into `ring` at the write cursor"""
+        n = len(chunk)
+        w = self._w
+        head = min(n, self.max_samples - w)
+        ring[w : w + head] = chunk[:head]
+        if head < n:
+            # Wrap around to the start of the ring
+            ring[: n - head] = chunk[head:]
+
+    def _slice(self, ring, start, count):
+        """Return `count` samples of `ring` starting at ring index `start`"""
+        start %= self.max_samples
+        end = start + count
+        if end <= self.max_samples:
+            return ring[start:end]
+        return np.concatenate((ring[start:], ring[: end - self.max_samples]))
+
+    def latest(self, ring, count):
+        """Return the newest `count` samples of `ring`, oldest first"""
+        return self._slice(ring, self._w - count, count)
+
+    def oldest(self):
+        """Ring index of the oldest valid sample"""
+        return (self._w - self._n) % self.max_samples
+
+    def stats(self):
+        """Per-channel float32 mean and standard deviation of the buffered samples"""
+        n = max(self._n, 1)
+        mean = self._sum / n
+        std = np.sqrt(np.maximum(self._sumsq / n - mean * mean, 0.0))
+        return mean.astype(np.float32), std.astype(np.float32)
 
 
 # Create a data buffer
 data_buffer = DataBuffer(max_samples=5000, num_channels=8, window_size=10.0)
+# Channel-major, since the heatmap shows one row per channel
+heatmap_buffer = np.empty(
+    (data_buffer.num_channels, data_buffer.max_samples), dtype=np.float32
+)
+
+# Frames handed off from the USB callback thread to the consumer thread.
+# deque.append/popleft are atomic, so no extra locking is needed.
+frame_queue = deque(maxlen=1024)
+queue_overflows = 0  # Frames evicted because the queue was full
+frames_ready = threading.Event()
+stop_consumer = threading.Event()
 
 
 # Callback function for receiving data from the device
 def on_data_received(frame):
-    # Add data to our buffer
-    data_buffer.add_frame(frame)
-
-    # Log the data to Rerun
-    log_data_to_rerun()
-
-    # Print some info about the received data (less frequently to avoid console spam)
-    if frame.timestamp % 1000 < 10:  # Print roughly every second
-        print(
-            f"Received frame with timestamp: {frame.timestamp}, samples: {len(frame.samples)}"
-        )
+    global queue_overflows
+    # Hand the frame off and return immediately so the USB side never waits.
+    # A full queue evicts its oldest frame on append, so count that loss.
+    if len(frame_queue) == frame_queue.maxlen:
+        queue_overflows += 1
+    frame_queue.append(frame)
+    frames_ready.set()
+
+
+def consume_frames():
+    """Drain queued frames into the buffer and flush them to Rerun in batches"""
+    last_flush = 0.0
+    while not stop_consumer.is_set():
+        try:
+            frames_ready.wait(FLUSH_INTERVAL)
+            frames_ready.clear()
+
+            while frame_queue:
+                timestamp, num_samples = data_buffer.add_frame(frame_queue.popleft())
+
+                # Log some info about the received data roughly every second
+                if log.isEnabledFor(logging.DEBUG) and timestamp % 1000 < 10:
+                    log.debug(
+                        "Received frame with timestamp: %d, samples: %d",
+                        timestamp,
+                        num_samples,
+                    )
+
+            # Log the data to Rerun once enough time or data has accumulated
+            now = time.monotonic()
+            pending_bytes = data_buffer.pending() * (data_buffer.num_channels * 4 + 8)
+            if now - last_flush >= FLUSH_INTERVAL or pending_bytes >= FLUSH_BYTES:
+                last_flush = now
+                log_data_to_rerun()
+        except Exception:
+            # Keep draining so one failed frame or flush doesn't stall the
+            # stream; the rest of the queue is still processed
+            log.exception("Error processing streamed frames")
 
 
 def setup_blueprint():
@@ -149,42 +311,43 @@ def log_data_to_rerun():
     if not data_buffer.initialized:
         setup_blueprint()
 
-    # Log each channel as a separate time series
-    for ch_idx, channel_data in enumerate(data_buffer.data):
-        if channel_data and data_buffer.timestamps:
-            # Get the most recent data that matches our timestamps
-            n_samples = min(len(channel_data), len(data_buffer.timestamps))
-            if n_samples > 0:
-                times = np.array(data_buffer.timestamps[-n_samples:])
-                values = np.array(channel_data[-n_samples:])
-
-                # Send to Rerun using columns for better performance
-                rr.send_columns(
-                    f"eeg/channel_{ch_idx + 1}",
-                    indexes=[rr.TimeSecondsColumn("time", times)],
-                    columns=[rr.components.ScalarBatch(values)],
-                )
-
-    # Log a heatmap of all channels
-    if all(len(ch) > 0 for ch in data_buffer.data):
-        # Create a 2D array with channels as rows
-        min_len = min(len(ch) for ch in data_buffer.data)
-        if min_len > 0:
-            heatmap_data = np.vstack([ch[-min_len:] for ch in data_buffer.data])
+    # Only send the samples that arrived since the last flush
+    new = data_buffer.pending()
+    if new == 0:
+        return
 
-            # Normalize for better visualization
-            heatmap_data = (heatmap_data - np.mean(heatmap_data)) / (
-                np.std(heatmap_data) + 1e-6
-            )
+    # Ring views unless the pending samples wrap around; Rerun casts every
+    # channel to a float64 copy itself, so there is nothing to stage here
+    times = data_buffer.latest(data_buffer.timestamps, new)
+    data = data_buffer.latest(data_buffer.data, new)
 
-            # Log the heatmap
-            rr.log(
-                "eeg/heatmap",
-                rr.Tensor2D(
-                    heatmap_data,
-                    colormap=rr.ColorMap.VIRIDIS,
-                ),
-            )
+    # Log each channel as a separate time series
+    for ch_idx in range(data_buffer.num_channels):
+        # Send to Rerun using columns for better performance
+        rr.send_columns(
+            f"eeg/channel_{ch_idx + 1}",
+            indexes=[rr.TimeSecondsColumn("time", times)],
+            columns=[rr.components.ScalarBatch(data[:, ch_idx])],
+        )
+    data_buffer.mark_logged()
+
+    # Log a heatmap of the whole window, normalized per channel with the
+    # running statistics for better visualization
+    mean, std = data_buffer.stats()
+    count = len(data_buffer)
+    unroll_normalize(
+        data_buffer.data, data_buffer.oldest(), count, mean, std, heatmap_buffer
+    )
+    heatmap_data = heatmap_buffer[:, :count]
+
+    # Log the heatmap
+    rr.log(
+        "eeg/heatmap",
+        rr.Tensor2D(
+            heatmap_data,
+            colormap=rr.ColorMap.VIRIDIS,
+        ),
+    )
 
 
 def main():
@@ -215,6 +378,15 @@ def main():
             ),
         )
 
+        # Timestamp samples using the device's configured sample rate
+        data_buffer.set_sample_rate(
+            parse_sample_rate(client.get_ads_config().sample_rate)
+        )
+
+        # Process frames off the USB callback thread
+        consumer = threading.Thread(target=consume_frames, daemon=True)
+        consumer.start()
+
         # Start streaming with our callback
         print("Starting data streaming...")
         config = client.start_streaming(callback=on_data_received)
@@ -233,6 +405,12 @@ def main():
 
         # Stop streaming
         client.stop_streaming()
+        stop_consumer.set()
+        consumer.join()
+        # Frames can only be lost where the consumer falls behind the queue;
+        # the binding's count stays zero since delivery is lossless
+        dropped = queue_overflows + client.get_dropped_frames()
+        print(f"Dropped frames: {dropped}")
 
     except dc.UsbConnectionError as e:
         print(f"Connection error: {e}")
@@ -242,12 +420,12 @@ def main():
         rr.log("error", rr.TextDocument(f"Communication error: {e}"))
     except Exception as e:
         print(f"Unexpected error: {e}")
-        import traceback
-
         error_text = traceback.format_exc()
         print(error_text)
         rr.log("error", rr.TextDocument(f"Unexpected error:\n{error_text}"))
 
 
 if __name__ == "__main__":
+    # Use logging.DEBUG to print received frame info
+    logging.basicConfig(level=logging.INFO)
     main()
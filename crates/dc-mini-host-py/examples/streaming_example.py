@@ -5,6 +5,7 @@ This script demonstrates how to receive real-time data from the device.
 """
 
 import time
+from collections import deque
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
@@ -16,26 +17,56 @@ class DataBuffer:
     def __init__(self, max_samples=1000, num_channels=8):
         self.max_samples = max_samples
         self.num_channels = num_channels
-        self.data = [[] for _ in range(num_channels)]
-        self.timestamps = []
+        # Preallocated ring buffers: _w is the write cursor, _n the number of
+        # valid samples (shared by all channels since frames are rectangular).
+        # The data ring is sample-major, matching the order samples arrive in,
+        # so each frame is one contiguous block write.
+        self.data = np.zeros((max_samples, num_channels), dtype=np.float32)
+        self.timestamps = np.zeros(max_samples, dtype=np.float64)
+        self._w = 0
+        self._n = 0
+
+    def __len__(self):
+        return self._n
 
     def add_frame(self, frame):
-        # Add the new samples to the buffer
-        for ch_idx, channel_samples in enumerate(frame.samples):
-            if ch_idx < self.num_channels:
-                self.data[ch_idx].extend(channel_samples)
-                # Trim to max_samples
-                if len(self.data[ch_idx]) > self.max_samples:
-                    self.data[ch_idx] = self.data[ch_idx][-self.max_samples :]
+        # Read each frame attribute once, since every access goes through a
+        # binding getter, and keep frequently used attributes in locals
+        timestamp = frame.timestamp
+        chunk = frame.samples_np
+        max_samples = self.max_samples
+
+        # `chunk` is a zero-copy int32 view of shape (samples, channels); the
+        # ring assignment below converts it to float32 in a single pass
+        if chunk.ndim != 2 or chunk.shape[0] == 0:
+            return
+        # Anything older than the ring capacity would be overwritten anyway
+        chunk = chunk[-max_samples:, : self.num_channels]
+        num_new_samples = chunk.shape[0]
 
         # Add timestamps (one per sample)
-        num_new_samples = len(frame.samples[0]) if frame.samples else 0
-        new_timestamps = [frame.timestamp + i for i in range(num_new_samples)]
-        self.timestamps.extend(new_timestamps)
-
-        # Trim timestamps to match data length
-        if len(self.timestamps) > self.max_samples:
-            self.timestamps = self.timestamps[-self.max_samples :]
+        new_timestamps = timestamp + np.arange(num_new_samples)
+
+        self._write(self.data[:, : chunk.shape[1]], chunk)
+        self._write(self.timestamps, new_timestamps)
+        self._w = (self._w + num_new_samples) % max_samples
+        self._n = min(self._n + num_new_samples, max_samples)
+
+    def _write(self, ring, chunk):
+        """Copy `chunk` (samples on the first axis) into `ring` at the write cursor"""
+        n = len(chunk)
+        w = self._w
+        head = min(n, self.max_samples - w)
+        ring[w : w + head] = chunk[:head]
+        if head < n:
+            # Wrap around to the start of the ring
+            ring[: n - head] = chunk[head:]
+
+    def ordered(self, ring):
+        """Return the valid part of `ring` with the oldest sample first"""
+        if self._n < self.max_samples:
+            return ring[: self._n]
+        return np.concatenate((ring[self._w :], ring[: self._w]))
 
 
 # Create a figure for plotting
@@ -43,6 +74,16 @@ fig, ax = plt.subplots(figsize=(12, 8))
 lines = []
 data_buffer = DataBuffer(max_samples=2000, num_channels=8)
 
+# Frames handed off from the USB callback thread to the animation, which
+# drains them on each tick. deque.append/popleft are atomic.
+frame_queue = deque(maxlen=1024)
+queue_overflows = 0  # Frames evicted because the queue was full
+
+# Plot inputs that never change, preallocated in init_plot: sample indices
+# for the x axis and a vertical offset per channel for better visualization
+x_full = None
+channel_offsets = None
+
 
 # Initialize the plot
 def init_plot():
@@ -52,8 +93,12 @@ def init_plot():
     ax.set_xlabel("Sample")
     ax.set_ylabel("Amplitude")
 
+    global lines, x_full, channel_offsets
+    x_full = np.arange(data_buffer.max_samples, dtype=np.int32)
+    # Adjust the spacing based on your signal amplitude
+    channel_offsets = np.arange(data_buffer.num_channels, dtype=np.float32) * 500000
+
     # Create a line for each channel
-    global lines
     for i in range(data_buffer.num_channels):
         (line,) = ax.plot([], [], label=f"Channel {i + 1}")
         lines.append(line)
@@ -64,29 +109,35 @@ def init_plot():
 
 # Update function for the animation
 def update_plot(frame):
+    # Move any frames received since the last tick into the buffer
+    while frame_queue:
+        data_buffer.add_frame(frame_queue.popleft())
+
+    if len(data_buffer) == 0:
+        return lines
+
+    y_data = data_buffer.ordered(data_buffer.data) + channel_offsets
+    x_data = x_full[: len(y_data)]
+
     # Update each line with the latest data
     for i, line in enumerate(lines):
-        if i < len(data_buffer.data) and data_buffer.data[i]:
-            # Add an offset to each channel for better visualization
-            offset = i * 500000  # Adjust based on your signal amplitude
-            y_data = [val + offset for val in data_buffer.data[i]]
-            x_data = range(len(y_data))
-            line.set_data(x_data, y_data)
+        if i < data_buffer.num_channels:
+            line.set_data(x_data, y_data[:, i])
 
     # Adjust x-axis limits if needed
-    if data_buffer.data[0]:
-        ax.set_xlim(0, len(data_buffer.data[0]))
+    ax.set_xlim(0, len(data_buffer))
 
     return lines
 
 
 # Callback function for receiving data from the device
 def on_data_received(frame):
-    # Print some info about the received data
-    print(
-        f"Received frame with timestamp: {frame.timestamp}, samples: {len(frame.samples)}"
-    )
-    # data_buffer.add_frame(frame)
+    global queue_overflows
+    # Hand the frame off and return immediately so the USB side never waits.
+    # A full queue evicts its oldest frame on append, so count that loss.
+    if len(frame_queue) == frame_queue.maxlen:
+        queue_overflows += 1
+    frame_queue.append(frame)
 
 
 def main():
@@ -119,6 +170,7 @@ def main():
         # Stop streaming when the plot is closed
         print("Stopping data streaming...")
         client.stop_streaming()
+        print(f"Frames lost to queue overflow: {queue_overflows}")
 
     except dc.UsbConnectionError as e:
         print(f"Connection error: {e}")
@@ -4,8 +4,12 @@ use dc_mini_host::icd::{
     DeviceInfo, FLeadOff, Gain, ILeadOff, Mux, ProfileCommand, SampleRate,
 };
 use pyo3::create_exception;
-use pyo3::exceptions::PyException;
+use pyo3::exceptions::{PyBufferError, PyException};
+use pyo3::ffi;
 use pyo3::prelude::*;
+use std::os::raw::{c_int, c_void};
+use std::ptr;
+use std::sync::atomic::{AtomicU64, AtomicUsize, Ordering};
 use std::sync::{Arc, Mutex};
 use std::thread;
 use tokio::runtime::Runtime;
@@ -85,10 +89,81 @@ struct PyAdsDataFrame {
     pub samples: Vec<PyAdsSample>,
     #[pyo3(get)]
     pub channel_data: Vec<Vec<i32>>, // Reorganized data for easier Python use
+    // Sample-major (samples, channels) copy of the data, exported read-only
+    // through the buffer protocol
+    data: Vec<i32>,
+    shape: [ffi::Py_ssize_t; 2],
+    strides: [ffi::Py_ssize_t; 2],
 }
 
 #[pymethods]
 impl PyAdsDataFrame {
+    /// Channel data as a read-only int32 NumPy array of shape
+    /// (channels, samples).
+    ///
+    /// The array is a transposed view of `samples_np`, so no samples are
+    /// copied or boxed into Python ints; it keeps the frame alive.
+    #[getter]
+    fn channel_data_np<'py>(
+        slf: &Bound<'py, Self>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        Self::samples_np(slf)?.getattr("T")
+    }
+
+    /// Sample data as a read-only int32 NumPy array of shape
+    /// (samples, channels).
+    ///
+    /// This is the order the samples arrive in, so the view is C-contiguous
+    /// and can be copied into a sample-major buffer in one contiguous pass.
+    #[getter]
+    fn samples_np<'py>(slf: &Bound<'py, Self>) -> PyResult<Bound<'py, PyAny>> {
+        slf.py().import("numpy")?.call_method1("asarray", (slf,))
+    }
+
+    unsafe fn __getbuffer__(
+        slf: Bound<'_, Self>,
+        view: *mut ffi::Py_buffer,
+        flags: c_int,
+    ) -> PyResult<()> {
+        if view.is_null() {
+            return Err(PyBufferError::new_err("View is null"));
+        }
+        if (flags & ffi::PyBUF_WRITABLE) == ffi::PyBUF_WRITABLE {
+            return Err(PyBufferError::new_err("Frame data is read-only"));
+        }
+
+        let frame = slf.borrow();
+        // SAFETY: the frame exposes no setters or `&mut self` methods, so
+        // `data`, `shape` and `strides` are never mutated or reallocated
+        // while the exporter, which the view holds in `obj`, is alive.
+        (*view).buf = frame.data.as_ptr() as *mut c_void;
+        (*view).len =
+            std::mem::size_of_val(frame.data.as_slice()) as ffi::Py_ssize_t;
+        (*view).readonly = 1;
+        (*view).itemsize = std::mem::size_of::<i32>() as ffi::Py_ssize_t;
+        (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+            c"i".as_ptr().cast_mut()
+        } else {
+            ptr::null_mut()
+        };
+        (*view).ndim = 2;
+        (*view).shape = if (flags & ffi::PyBUF_ND) == ffi::PyBUF_ND {
+            frame.shape.as_ptr().cast_mut()
+        } else {
+            ptr::null_mut()
+        };
+        (*view).strides = if (flags & ffi::PyBUF_STRIDES) == ffi::PyBUF_STRIDES
+        {
+            frame.strides.as_ptr().cast_mut()
+        } else {
+            ptr::null_mut()
+        };
+        (*view).suboffsets = ptr::null_mut();
+        (*view).internal = ptr::null_mut();
+        (*view).obj = slf.clone().into_any().into_ptr();
+        Ok(())
+    }
+
     #[pyo3(name = "__repr__")]
     fn repr(&self) -> String {
         // You can rely on the Debug trait to format all fields, or do it manually.
@@ -131,16 +206,30 @@ impl From<AdsDataFrame> for PyAdsDataFrame {
         // Create vectors for each channel
         let mut channel_data = vec![Vec::new(); num_channels];
 
+        let mut data = vec![0; frame.samples.len() * num_channels];
+
         // Fill the channel data
-        for sample in &frame.samples {
+        for (s, sample) in frame.samples.iter().enumerate() {
             for (i, value) in sample.data.iter().enumerate() {
                 if i < channel_data.len() {
                     channel_data[i].push(*value);
+                    data[s * num_channels + i] = *value;
                 }
             }
         }
 
-        Self { timestamp: frame.ts, samples: py_samples, channel_data }
+        let item = std::mem::size_of::<i32>() as ffi::Py_ssize_t;
+        Self {
+            timestamp: frame.ts,
+            samples: py_samples,
+            channel_data,
+            data,
+            shape: [
+                frame.samples.len() as ffi::Py_ssize_t,
+                num_channels as ffi::Py_ssize_t,
+            ],
+            strides: [num_channels as ffi::Py_ssize_t * item, item],
+        }
     }
 }
 
@@ -176,6 +265,7 @@ struct PyUsbClient {
     streaming_callback: Arc<Mutex<Option<PyObject>>>,
     streaming_task: Arc<Mutex<Option<tokio::task::JoinHandle<()>>>>,
     py_callback_thread: Arc<Mutex<Option<thread::JoinHandle<()>>>>,
+    dropped_frames: Arc<AtomicU64>,
 }
 
 #[pymethods]
@@ -204,18 +294,35 @@ impl PyUsbClient {
             streaming_callback: Arc::new(Mutex::new(None)),
             streaming_task: Arc::new(Mutex::new(None)),
             py_callback_thread: Arc::new(Mutex::new(None)),
+            dropped_frames: Arc::new(AtomicU64::new(0)),
         })
     }
 
     // ADS Service Methods
-    #[pyo3(signature = (callback=None))]
+    // `max_pending_frames` bounds the frames waiting for the Python callback;
+    // when it is set, frames arriving while that many are pending are dropped
+    // and counted. By default every frame is delivered.
+    #[pyo3(signature = (callback=None, queue_depth=8, max_pending_frames=None))]
     fn start_streaming(
         &self,
         py: Python<'_>,
         callback: Option<PyObject>,
+        queue_depth: usize,
+        max_pending_frames: Option<usize>,
     ) -> PyResult<PyAdsConfig> {
         let client = self.client.clone();
 
+        if queue_depth == 0 {
+            return Err(PyException::new_err(
+                "queue_depth must be at least 1",
+            ));
+        }
+        if max_pending_frames == Some(0) {
+            return Err(PyException::new_err(
+                "max_pending_frames must be at least 1",
+            ));
+        }
+
         // First, stop any existing streaming
         self.stop_streaming_internal();
 
@@ -234,7 +341,7 @@ impl PyUsbClient {
 
         // If we have a callback, start the streaming task
         if self.streaming_callback.lock().unwrap().is_some() {
-            self.start_streaming_task();
+            self.start_streaming_task(queue_depth, max_pending_frames);
         }
 
         Ok(PyAdsConfig::from(config))
@@ -249,6 +356,12 @@ impl PyUsbClient {
         })
     }
 
+    /// Number of frames dropped since streaming started because more than
+    /// `max_pending_frames` were waiting for the Python callback
+    fn get_dropped_frames(&self) -> u64 {
+        self.dropped_frames.load(Ordering::Relaxed)
+    }
+
     fn reset_ads_config(&self) -> PyResult<bool> {
         let client = self.client.clone();
         self.runtime.block_on(async move {
@@ -366,25 +479,42 @@ impl PyUsbClient {
 }
 
 impl PyUsbClient {
-    fn start_streaming_task(&self) {
+    fn start_streaming_task(
+        &self,
+        queue_depth: usize,
+        max_pending_frames: Option<usize>,
+    ) {
         let client = self.client.clone();
         let callback = self.streaming_callback.clone();
         let runtime = self.runtime.handle().clone();
+        let dropped_frames = self.dropped_frames.clone();
+        dropped_frames.store(0, Ordering::Relaxed);
 
         // Create a channel for sending data from the async task to the Python callback thread
         let (tx, mut rx) = mpsc::unbounded_channel();
+        // Frames sent but not yet passed to the Python callback
+        let pending = Arc::new(AtomicUsize::new(0));
+        let pending_rx = pending.clone();
 
         // Start the async task to receive data from the device
         let streaming_task = runtime.spawn(async move {
-            // Subscribe to the ADS data topic
+            // Subscribe to the ADS data topic, keeping up to `queue_depth`
+            // frames in flight while this task is not scheduled
             let sub = client
                 .client
-                .subscribe_multi::<dc_mini_host::icd::AdsTopic>(8)
+                .subscribe_multi::<dc_mini_host::icd::AdsTopic>(queue_depth)
                 .await;
 
             if let Ok(mut sub) = sub {
                 println!("Subscribed to ADS data topic");
                 while let Ok(frame) = sub.recv().await {
+                    if let Some(max) = max_pending_frames {
+                        if pending.load(Ordering::Acquire) >= max {
+                            dropped_frames.fetch_add(1, Ordering::Relaxed);
+                            continue;
+                        }
+                    }
+                    pending.fetch_add(1, Ordering::AcqRel);
                     // Send the frame to the Python callback thread
                     if tx.send(frame).is_err() {
                         // Channel closed, exit the task
@@ -402,19 +532,28 @@ impl PyUsbClient {
         // Start a thread to call the Python callback
         let py_thread = thread::spawn(move || {
             while let Some(frame) = rx.blocking_recv() {
-                // Convert the frame to a Python object
-                let py_frame = PyAdsDataFrame::from(frame);
+                // Convert this frame and any others already waiting, so a
+                // burst of frames is delivered under a single GIL acquisition
+                let mut batch = vec![PyAdsDataFrame::from(frame)];
+                while let Ok(frame) = rx.try_recv() {
+                    batch.push(PyAdsDataFrame::from(frame));
+                }
+                let delivered = batch.len();
 
-                // Call the Python callback with a fresh GIL acquisition for each frame
                 Python::with_gil(|py| {
                     if let Some(callback) = &*callback.lock().unwrap() {
-                        let args = (py_frame.clone(),);
-                        if let Err(e) = callback.call1(py, args) {
-                            println!("Error calling Python callback: {:?}", e);
-                            // Continue processing even if the callback fails
+                        for py_frame in batch {
+                            if let Err(e) = callback.call1(py, (py_frame,)) {
+                                println!(
+                                    "Error calling Python callback: {:?}",
+                                    e
+                                );
+                                // Continue processing even if the callback fails
+                            }
                         }
                     }
                 });
+                pending_rx.fetch_sub(delivered, Ordering::AcqRel);
             }
         });
 
@@ -1,7 +1,7 @@
 # /// script
 # requires-python = ">=3.13"
 # dependencies = [
-#     "neuroconv[edf]",
+#     "neuroconv[edf]>=0.10,<0.12",
 #     "numpy",
 #     "tzdata",
 # ]
@@ -13,6 +13,42 @@ from pathlib import Path
 from typing import Optional
 from zoneinfo import ZoneInfo
 from neuroconv.datainterfaces import EDFRecordingInterface
+from neuroconv.tools.nwb_helpers import (
+    configure_and_write_nwbfile,
+    get_default_backend_configuration,
+)
+
+# HDF5 chunk length along the time axis (chunks span all channels)
+CHUNK_SAMPLES = 8192
+# Chunks per read buffer; the recording is streamed through buffers of this
+# size instead of being loaded whole
+BUFFER_CHUNKS = 16
+
+
+def iterator_options(interface: EDFRecordingInterface) -> dict:
+    """Chunk-aligned read buffers for the recording's data iterator.
+
+    The HDF5 chunk shape is taken from the iterator, and each buffer holds a
+    whole number of time chunks spanning all channels.
+    """
+    recording = interface.recording_extractor
+    num_samples = recording.get_num_samples()
+    num_channels = recording.get_num_channels()
+    chunk_samples = min(CHUNK_SAMPLES, num_samples)
+    return {
+        "chunk_shape": (chunk_samples, num_channels),
+        "buffer_shape": (
+            min(BUFFER_CHUNKS * chunk_samples, num_samples),
+            num_channels,
+        ),
+    }
+
+
+def configure_datasets(backend_configuration) -> None:
+    """Use gzip-compressed HDF5 datasets for the NWB output."""
+    for dataset_configuration in backend_configuration.dataset_configurations.values():
+        dataset_configuration.compression_method = "gzip"
+        dataset_configuration.compression_options = {"level": 4}
 
 
 def convert_edf_to_nwb(
@@ -59,16 +95,34 @@ def convert_edf_to_nwb(
     if session_start_time.tzinfo is None:
         session_start_time = session_start_time.replace(tzinfo=ZoneInfo(timezone))
 
-    source_metadata["NWBFile"]["experimenter"] = [
-        source_metadata["NWBFile"]["experimenter"]
-    ]
+    experimenter = source_metadata["NWBFile"].get("experimenter")
+    if isinstance(experimenter, str):
+        source_metadata["NWBFile"]["experimenter"] = [experimenter]
 
     # Create output directory if it doesn't exist
     nwb_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Run the conversion
+    # Run the conversion. The NWB file is built around lazy data iterators, so
+    # samples are only read chunk by chunk while the HDF5 file is written.
     print("Running Conversion")
-    interface.run_conversion(nwbfile_path=str(nwb_path), metadata=source_metadata)
+    nwbfile = interface.create_nwbfile(
+        metadata=source_metadata,
+        stub_test=False,
+        iterator_options=iterator_options(interface),
+        # Neo's EDF recordings carry no time vector, so the ElectricalSeries
+        # is written with starting_time and rate rather than per-sample
+        # timestamps
+        always_write_timestamps=False,
+    )
+    backend_configuration = get_default_backend_configuration(
+        nwbfile=nwbfile, backend="hdf5"
+    )
+    configure_datasets(backend_configuration)
+    configure_and_write_nwbfile(
+        nwbfile=nwbfile,
+        nwbfile_path=nwb_path,
+        backend_configuration=backend_configuration,
+    )
 
 
 def main():
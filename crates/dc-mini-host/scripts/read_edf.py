@@ -2,13 +2,48 @@ import pyedflib
 from pathlib import Path
 import numpy as np
 
+
+def read_digital_signals(file_name):
+    """Read all ordinary signals as int16 with a single pass over the data records.
+
+    EDF stores each data record as consecutive blocks of 16-bit samples, one
+    block per signal, with the EDF+ annotation signal written last. The data
+    records are memory-mapped and deinterleaved with a reshape view, so the
+    only copy made is the returned (signals, samples) array.
+    """
+    with pyedflib.EdfReader(str(file_name)) as f:
+        n = f.signals_in_file
+        n_records = f.datarecords_in_file
+        spr = np.array(f.getNSamples()) // n_records
+    if not np.all(spr == spr[0]):
+        raise ValueError("Signals with different sample rates are not supported")
+
+    with open(file_name, "rb") as fh:
+        fh.seek(184)
+        header_bytes = int(fh.read(8))
+    data_bytes = Path(file_name).stat().st_size - header_bytes
+    record_len = data_bytes // (2 * n_records)
+    records = np.memmap(
+        file_name,
+        dtype="<i2",
+        mode="r",
+        offset=header_bytes,
+        shape=(n_records, record_len),
+    )
+    return (
+        records[:, : n * spr[0]]
+        .reshape(n_records, n, spr[0])
+        .transpose(1, 0, 2)
+        .reshape(n, -1)
+    )
+
+
 file_name = Path.home() / Path("Documents/repos/scratch/rrd-conv/000.edf")
 f = pyedflib.EdfReader(str(file_name))
 n = f.signals_in_file
 signal_labels = f.getSignalLabels()
-sigbufs = np.zeros((n, f.getNSamples()[0]))
+sigbufs = read_digital_signals(file_name)
 for i in np.arange(n):
-    sigbufs[i, :] = f.readSignal(i)
     print(f"{f.getSampleFrequency(i)=}")
 print(f"{sigbufs.shape=}, {sigbufs=}")
 print(f"{f.getSignalHeaders()=}")